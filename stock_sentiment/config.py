@@ -20,11 +20,24 @@ NEWS_LOOKBACK_DAYS = 7   # Fetch news from the past N days
 
 # Concurrency config
 MAX_CONCURRENT_LLM_CALLS = 5  # Max parallel LLM API calls
+MAX_CONCURRENT_STOCKS = 8     # Max stocks analyzed in parallel (-a mode)
+MAX_IN_FLIGHT_LLM_CALLS = 20  # Max LLM requests in flight across all stocks
+LLM_BATCH_SIZE = 5            # News articles scored per LLM request
+
+# LLM retry config (transient 429/5xx responses)
+LLM_MAX_RETRIES = 3       # Retries before giving up on a request
+LLM_BACKOFF_FACTOR = 0.5  # Exponential backoff: 0.5s, 1s, 2s, ...
+LLM_BACKOFF_MAX_S = 8     # Upper bound on a single backoff sleep
 
 # WaveSpeed LLM API config
 WAVESPEED_API_URL = "https://api.wavespeed.ai/api/v3/wavespeed-ai/any-llm"
 LLM_MODEL = "anthropic/claude-3.7-sonnet"
 
+# LLM response cache config
+LLM_CACHE_MODE = "on"              # "off", "read_only" or "on"
+LLM_CACHE_TTL_S = 7 * 24 * 3600    # Cached responses expire after N seconds (0 = never)
+LLM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "llm_cache.sqlite3")
+
 # Target stock list (tech sector)
 TECH_STOCKS = [
     "AAPL",   # Apple
@@ -56,3 +69,24 @@ Rules:
 - reason: brief explanation in under 30 words
 - Return ONLY the JSON object, nothing else
 """
+
+# Batched sentiment prompt (several articles per LLM request, see LLM_BATCH_SIZE)
+BATCH_ARTICLE_TEMPLATE = """{index}. [{ticker}] {title}
+   Summary: {description}
+   Published: {published_date}"""
+
+BATCH_SENTIMENT_PROMPT = """You are a professional financial analyst. Analyze each of the following {count} news articles and provide a sentiment score for the stock shown in brackets.
+
+{articles}
+
+Return ONLY a valid JSON array with one object per article, in this exact format (no other text, no markdown):
+[{{"index": 1, "sentiment": "bullish", "score": 75, "confidence": 80, "reason": "brief explanation"}}]
+
+Rules:
+- index: the article number as listed above
+- sentiment: must be "bullish", "neutral", or "bearish"
+- score: integer 0-100 (50=neutral, 100=extremely bullish, 0=extremely bearish)
+- confidence: integer 0-100 (your confidence level)
+- reason: brief explanation in under 30 words
+- Return ONLY the JSON array, nothing else
+"""
@@ -0,0 +1,13 @@
+"""
+Console Module - Thread-safe progress logging
+Stocks and their LLM batches run on worker threads; log() keeps each message's lines together.
+"""
+import threading
+
+_print_lock = threading.Lock()
+
+
+def log(*lines: str):
+    """Print one or more lines without interleaving with other threads"""
+    with _print_lock:
+        print("\n".join(lines))
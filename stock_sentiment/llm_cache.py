@@ -0,0 +1,108 @@
+"""
+LLM Cache Module - Content-addressed on-disk cache for LLM responses
+Backed by SQLite so it is safe to share across threads and processes.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+import config
+
+
+CACHE_MODES = ("off", "read_only", "on")
+
+
+class LLMCache:
+    """Cache LLM response text keyed by sha256(model + prompt)"""
+
+    def __init__(self, path: str = None, mode: str = None, ttl: int = None):
+        self.path = path or config.LLM_CACHE_PATH
+        self.mode = mode or config.LLM_CACHE_MODE
+        self.ttl = config.LLM_CACHE_TTL_S if ttl is None else ttl
+
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Invalid LLM cache mode '{self.mode}'. Expected one of: {', '.join(CACHE_MODES)}")
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if self.mode == "read_only":
+            # Never create or modify the DB; a missing file is just an empty cache
+            if os.path.exists(self.path):
+                self._conn = sqlite3.connect(
+                    f"file:{self.path}?mode=ro", uri=True, timeout=30, check_same_thread=False
+                )
+        elif self.mode == "on":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self.prune()
+
+    @staticmethod
+    def make_key(model: str, prompt: str) -> str:
+        """Build the cache key for a (model, prompt) pair"""
+        return hashlib.sha256(f"{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached response text, or None on miss / expiry / cache off
+        """
+        if self._conn is None:
+            return None
+
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.OperationalError:
+                return None  # read-only DB without the table yet
+
+        if row is None:
+            return None
+
+        response, created_at = row
+        if self._is_expired(created_at):
+            if self.mode == "on":
+                with self._lock:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+            return None
+
+        return response
+
+    def prune(self):
+        """Delete every expired entry (no-op unless mode is 'on' and a TTL is set)"""
+        if self._conn is None or self.mode != "on" or not self.ttl:
+            return
+
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.time() - created_at > self.ttl
+
+    def set(self, key: str, response: str):
+        """Store a response (no-op unless mode is 'on')"""
+        if self._conn is None or self.mode != "on":
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            self._conn.commit()
@@ -2,23 +2,45 @@
 Main entry point - Stock Sentiment Analysis System
 """
 import argparse
-import json
-import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict
+import orjson
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: fall back to pandas' CSV writer
+    pa = None
+
+from console import log
 from news_fetcher import NewsFetcher
 from sentiment_analyzer import SentimentAnalyzer
 import config
 
 # Results directory
-RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+RESULTS_DIR.mkdir(exist_ok=True)
+
+# JSON output options (pretty-printed, UTF-8 preserved)
+JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def write_csv(df: pd.DataFrame, path: Path):
+    """
+    Write a DataFrame as CSV, using pyarrow's native writer when it is installed.
 
+    The two writers format slightly differently: pyarrow quotes the header and
+    string values and writes whole floats without a decimal (80 vs pandas' 80.0).
+    Both quote values containing commas, quotes or newlines.
+    """
+    if pa is None:
+        df.to_csv(path, index=False)
+        return
 
-def ensure_results_dir():
-    """Create results directory if it doesn't exist"""
-    os.makedirs(RESULTS_DIR, exist_ok=True)
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), str(path))
 
 
 class StockSentimentSystem:
@@ -39,29 +61,35 @@ class StockSentimentSystem:
         Returns:
             Complete analysis result
         """
-        print(f"\n{'='*60}")
-        print(f"Analyzing: {ticker}")
-        print(f"{'='*60}")
+        lookback = config.NEWS_LOOKBACK_DAYS
+        analysis_time = datetime.now().isoformat()
+
+        log(
+            f"\n{'='*60}",
+            f"Analyzing: {ticker}",
+            f"{'='*60}",
+            f"\n[1/2] Fetching news for {ticker} (last {lookback} days, limit {news_limit})..."
+        )
 
         # 1. Fetch news
-        print(f"\n[1/2] Fetching news (last {config.NEWS_LOOKBACK_DAYS} days, limit {news_limit})...")
         news_list = self.news_fetcher.get_news(ticker, limit=news_limit)
 
         if not news_list:
-            print(f"Warning: No news found for {ticker}")
+            log(f"Warning: No news found for {ticker}")
             return {
                 "ticker": ticker,
-                "analysis_time": datetime.now().isoformat(),
+                "analysis_time": analysis_time,
                 "final_score": 50,
                 "sentiment": "neutral",
                 "news_count": 0,
                 "message": "No news found"
             }
 
-        print(f"  Found {len(news_list)} articles")
-
         # 2. Analyze sentiment
-        print(f"\n[2/2] Analyzing sentiment...")
+        log(
+            f"  Found {len(news_list)} articles for {ticker}",
+            f"\n[2/2] Analyzing sentiment for {ticker}..."
+        )
         analysis_results = self.sentiment_analyzer.analyze_news_batch(news_list)
 
         # 3. Aggregate results
@@ -69,8 +97,8 @@ class StockSentimentSystem:
 
         result = {
             "ticker": ticker,
-            "analysis_time": datetime.now().isoformat(),
-            "lookback_days": config.NEWS_LOOKBACK_DAYS,
+            "analysis_time": analysis_time,
+            "lookback_days": lookback,
             **aggregated
         }
 
@@ -82,7 +110,8 @@ class StockSentimentSystem:
         news_limit: int = 20
     ) -> pd.DataFrame:
         """
-        Analyze multiple stocks.
+        Analyze multiple stocks concurrently (one worker per stock, capped
+        at config.MAX_CONCURRENT_STOCKS).
 
         Args:
             tickers: List of tickers, defaults to config.TECH_STOCKS
@@ -92,12 +121,19 @@ class StockSentimentSystem:
             DataFrame with all analysis results
         """
         tickers = tickers or config.TECH_STOCKS
-        all_results = []
-        rows = []
+        all_results = [None] * len(tickers)
+
+        with ThreadPoolExecutor(max_workers=min(len(tickers), config.MAX_CONCURRENT_STOCKS)) as executor:
+            future_to_idx = {
+                executor.submit(self.analyze_stock, ticker, news_limit): i
+                for i, ticker in enumerate(tickers)
+            }
 
-        for ticker in tickers:
-            result = self.analyze_stock(ticker, news_limit)
-            all_results.append(result)
+            for future in as_completed(future_to_idx):
+                all_results[future_to_idx[future]] = future.result()
+
+        rows = []
+        for result in all_results:
             rows.append({
                 "ticker": result["ticker"],
                 "score": result["final_score"],
@@ -125,30 +161,28 @@ class StockSentimentSystem:
             full_results: List of detailed result dicts (one per stock)
             summary_df: Summary DataFrame
         """
-        ensure_results_dir()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
         # Save detailed JSON
-        json_path = os.path.join(RESULTS_DIR, f"analysis_{timestamp}.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(full_results, f, indent=2, ensure_ascii=False)
+        json_path = RESULTS_DIR / f"analysis_{timestamp}.json"
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(full_results, option=JSON_OPTIONS))
 
         # Save summary CSV
-        csv_path = os.path.join(RESULTS_DIR, f"summary_{timestamp}.csv")
-        summary_df.to_csv(csv_path, index=False)
+        csv_path = RESULTS_DIR / f"summary_{timestamp}.csv"
+        write_csv(summary_df, csv_path)
 
         print(f"\n[Saved] Detailed results -> {json_path}")
         print(f"[Saved] Summary CSV     -> {csv_path}")
 
     def save_single_result(self, result: Dict):
         """Save a single stock analysis result"""
-        ensure_results_dir()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         ticker = result.get("ticker", "UNKNOWN")
 
-        json_path = os.path.join(RESULTS_DIR, f"{ticker}_{timestamp}.json")
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        json_path = RESULTS_DIR / f"{ticker}_{timestamp}.json"
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(result, option=JSON_OPTIONS))
 
         print(f"\n[Saved] {ticker} result -> {json_path}")
 
@@ -191,14 +225,23 @@ class StockSentimentSystem:
         print(f"{'Rank':<6} {'Ticker':<8} {'Score':<8} {'Sentiment':<12} {'Articles':<10} {'Confidence':<10}")
         print("-" * 70)
 
-        for i, row in df.iterrows():
-            sentiment_display = {
-                "bullish": "BULLISH",
-                "neutral": "NEUTRAL",
-                "bearish": "BEARISH"
-            }.get(row["sentiment"], "UNKNOWN")
+        sentiment_labels = {
+            "bullish": "BULLISH",
+            "neutral": "NEUTRAL",
+            "bearish": "BEARISH"
+        }
 
-            print(f"{i+1:<6} {row['ticker']:<8} {row['score']:<8.1f} {sentiment_display:<12} {row['news_count']:<10} {row['avg_confidence']:<10.1f}")
+        rows = zip(
+            df["ticker"].to_numpy(),
+            df["score"].to_numpy(),
+            df["sentiment"].to_numpy(),
+            df["news_count"].to_numpy(),
+            df["avg_confidence"].to_numpy()
+        )
+        for i, (ticker, score, sentiment, news_count, confidence) in enumerate(rows):
+            sentiment_display = sentiment_labels.get(sentiment, "UNKNOWN")
+
+            print(f"{i+1:<6} {ticker:<8} {score:<8.1f} {sentiment_display:<12} {news_count:<10} {confidence:<10.1f}")
 
         print("-" * 70)
 
@@ -5,6 +5,7 @@ import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import config
+from console import log
 
 
 class NewsFetcher:
@@ -62,11 +63,11 @@ class NewsFetcher:
                 news_list = data.get("results", [])
                 return self._process_news(news_list, ticker)
             else:
-                print(f"API返回异常: {data}")
+                log(f"API返回异常: {data}")
                 return []
                 
         except requests.exceptions.RequestException as e:
-            print(f"获取新闻失败: {e}")
+            log(f"获取新闻失败: {e}")
             return []
     
     def _process_news(self, news_list: List[Dict], ticker: str) -> List[Dict]:
@@ -1,18 +1,36 @@
 """
 Sentiment Analysis Module - Uses WaveSpeed AI API (Claude 3.7 Sonnet) for news sentiment
-Supports concurrent LLM calls for faster batch analysis.
+Supports concurrent LLM calls for faster batch analysis and caches responses on disk.
 """
-import json
+import re
+import threading
+from collections import Counter
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
 import config
+from console import log
+from llm_cache import LLMCache
+
+# Reason attached to the neutral placeholder used when an article could not be analyzed
+FAILED_REASON = "Analysis failed, using default"
+
+# A fenced ```json block; searched first so brackets in surrounding prose can't win
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+# Fallback for unfenced replies: an array of objects or a bare object. Arrays must start
+# with "[{" so prose like "[AAPL]" or "[note]" is skipped.
+_JSON_BARE = re.compile(r"\[\s*\{.*\}\s*\]|\{.*\}", re.DOTALL)
 
 
 class SentimentAnalyzer:
     """Analyze news sentiment using LLM via WaveSpeed AI API"""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache_mode: str = None):
         self.api_key = api_key or config.WAVESPEED_API_KEY
 
         if not self.api_key:
@@ -21,36 +39,93 @@ class SentimentAnalyzer:
         self.api_url = config.WAVESPEED_API_URL
         self.model = config.LLM_MODEL
         self.max_workers = config.MAX_CONCURRENT_LLM_CALLS
+        self.cache = LLMCache(mode=cache_mode)
 
-    def _call_llm(self, prompt: str) -> str:
-        """
-        Call WaveSpeed AI API and return the response text.
-
-        Args:
-            prompt: The prompt to send to the LLM
-
-        Returns:
-            Response text from the LLM
-        """
-        headers = {
+        # Request pieces that never change between calls
+        self._headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}"
         }
-
-        payload = {
+        self._payload_template = {
             "enable_sync_mode": True,
             "model": self.model,
             "priority": "latency",
-            "prompt": prompt,
             "reasoning": False
         }
-
-        response = requests.post(
-            self.api_url,
-            headers=headers,
-            json=payload,
-            timeout=60
+        self._format_prompt = config.SENTIMENT_PROMPT.format_map
+        self._format_batch_prompt = config.BATCH_SENTIMENT_PROMPT.format_map
+        self._format_batch_article = config.BATCH_ARTICLE_TEMPLATE.format_map
+        # Caps in-flight requests across all stock workers sharing this analyzer
+        self._in_flight = threading.BoundedSemaphore(config.MAX_IN_FLIGHT_LLM_CALLS)
+
+        # Shared keep-alive session so concurrent calls reuse pooled TLS connections.
+        # Transient 429/5xx responses are retried with capped exponential backoff,
+        # honoring Retry-After when the API sends it. Read errors/timeouts are not
+        # retried: the (paid) POST may already have been processed.
+        retry = Retry(
+            total=config.LLM_MAX_RETRIES,
+            read=0,
+            backoff_factor=config.LLM_BACKOFF_FACTOR,
+            backoff_max=config.LLM_BACKOFF_MAX_S,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=None,  # also retry POST
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=config.MAX_IN_FLIGHT_LLM_CALLS,
+            max_retries=retry
         )
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+
+    def _call_llm(self, prompt: str, parse: Callable[[str], Any]) -> Any:
+        """
+        Return the parsed LLM response for a prompt, serving it from the on-disk cache when possible.
+        Cache hits return early without taking an in-flight slot. A reply is only cached once
+        parse() accepts it, so malformed replies are never replayed from the cache.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            parse: Turns the response text into the caller's value; raises if the reply is unusable
+
+        Returns:
+            The value returned by parse()
+        """
+        key = LLMCache.make_key(self.model, prompt)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            try:
+                return parse(cached)
+            except ValueError:
+                pass  # unusable cache entry: fetch a fresh reply and overwrite it
+
+        text = self._request_llm(prompt)
+        parsed = parse(text)
+        self.cache.set(key, text)
+        return parsed
+
+    def _request_llm(self, prompt: str) -> str:
+        """
+        Call WaveSpeed AI API and return the response text.
+
+        Args:
+            prompt: The prompt to send to the LLM
+
+        Returns:
+            Response text from the LLM
+        """
+        payload = {**self._payload_template, "prompt": prompt}
+
+        with self._in_flight:
+            response = self._session.post(
+                self.api_url,
+                headers=self._headers,
+                json=payload,
+                timeout=60
+            )
         response.raise_for_status()
 
         data = response.json()
@@ -73,49 +148,164 @@ class SentimentAnalyzer:
         Returns:
             Sentiment result with sentiment, score, confidence, reason
         """
-        prompt = config.SENTIMENT_PROMPT.format(
-            ticker=news.get("ticker", "Unknown"),
-            title=news.get("title", ""),
-            description=news.get("description", ""),
-            published_date=news.get("published_utc", "")
-        )
-
         try:
-            result_text = self._call_llm(prompt)
-
-            # Clean up potential markdown code blocks
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
-
-            result = json.loads(result_text)
+            result = self._call_llm(self._single_prompt(news), self._parse_object)
 
             # Attach original news info
-            result["title"] = news.get("title", "")
-            result["source"] = news.get("source", "")
-            result["published_utc"] = news.get("published_utc", "")
+            self._attach_news_info(result, news)
 
             if index and total:
-                print(f"  [{index}/{total}] Done - {result.get('sentiment', '?')} ({result.get('score', '?')})")
+                log(f"  [{news.get('ticker', '?')} {index}/{total}] Done - {result.get('sentiment', '?')} ({result.get('score', '?')})")
 
             return result
 
-        except json.JSONDecodeError as e:
-            print(f"  [{index}/{total}] JSON parse failed: {e}")
+        except orjson.JSONDecodeError as e:
+            log(f"  [{news.get('ticker', '?')} {index}/{total}] JSON parse failed: {e}")
             return self._default_result(news)
 
         except Exception as e:
-            print(f"  [{index}/{total}] Analysis failed: {e}")
+            log(f"  [{news.get('ticker', '?')} {index}/{total}] Analysis failed: {e}")
             return self._default_result(news)
 
+    def analyze_news_minibatch(self, news_sublist: List[Dict], offset: int = 0, total: int = 0) -> List[Dict]:
+        """
+        Analyze sentiment for several news articles with a single LLM call.
+        Each scored article is cached individually under its single-article key.
+
+        Args:
+            news_sublist: News dicts to score together
+            offset: Position of the first article in the full batch (for logging)
+            total: Total number of articles (for logging)
+
+        Returns:
+            Sentiment results in the same order as news_sublist
+        """
+        count = len(news_sublist)
+        ticker = news_sublist[0].get("ticker", "?")
+        label = f"{ticker} {offset + 1}-{offset + count}/{total}"
+
+        articles = "\n\n".join(
+            self._format_batch_article({
+                "index": i,
+                "ticker": news.get("ticker", "Unknown"),
+                "title": news.get("title", ""),
+                "description": news.get("description", ""),
+                "published_date": news.get("published_utc", "")
+            })
+            for i, news in enumerate(news_sublist, 1)
+        )
+        prompt = self._format_batch_prompt({"count": count, "articles": articles})
+
+        try:
+            parsed = self._parse_array(self._request_llm(prompt))
+
+            by_index = {}
+            for item in parsed:
+                try:
+                    by_index[int(item["index"])] = item
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+            results = []
+            scored = 0
+            for i, news in enumerate(news_sublist, 1):
+                item = by_index.get(i)
+                if item is None:
+                    results.append(self._default_result(news))
+                    continue
+
+                result = {
+                    "sentiment": item.get("sentiment", "neutral"),
+                    "score": item.get("score", 50),
+                    "confidence": item.get("confidence", 50),
+                    "reason": item.get("reason", "")
+                }
+                # Cache per article (same key as analyze_single_news), so hits don't
+                # depend on which other articles shared this request
+                self.cache.set(self._article_cache_key(news), orjson.dumps(result).decode("utf-8"))
+                results.append(self._attach_news_info(result, news))
+                scored += 1
+
+            if total:
+                log(f"  [{label}] Done - {scored}/{count} scored")
+
+            return results
+
+        except orjson.JSONDecodeError as e:
+            log(f"  [{label}] JSON parse failed: {e}")
+            return [self._default_result(news) for news in news_sublist]
+
+        except Exception as e:
+            log(f"  [{label}] Analysis failed: {e}")
+            return [self._default_result(news) for news in news_sublist]
+
+    @staticmethod
+    def _extract_json(text: str) -> str:
+        """Pull the JSON payload out of an LLM response (fenced or bare)"""
+        match = _JSON_FENCE.search(text)
+        if match:
+            return match.group(1)
+
+        match = _JSON_BARE.search(text)
+        if match:
+            return match.group(0)
+
+        return text
+
+    def _single_prompt(self, news: Dict) -> str:
+        """Build the single-article sentiment prompt for a news dict"""
+        return self._format_prompt({
+            "ticker": news.get("ticker", "Unknown"),
+            "title": news.get("title", ""),
+            "description": news.get("description", ""),
+            "published_date": news.get("published_utc", "")
+        })
+
+    def _article_cache_key(self, news: Dict) -> str:
+        """Cache key for one article's result, shared by the single and batched paths"""
+        return LLMCache.make_key(self.model, self._single_prompt(news))
+
+    def _cached_result(self, news: Dict) -> Optional[Dict]:
+        """Return the cached result for an article, or None on miss"""
+        cached = self.cache.get(self._article_cache_key(news))
+        if cached is None:
+            return None
+        try:
+            return self._attach_news_info(self._parse_object(cached), news)
+        except ValueError:
+            return None
+
+    @classmethod
+    def _parse_object(cls, text: str) -> Dict:
+        """Parse an LLM reply that must contain a single JSON object"""
+        parsed = orjson.loads(cls._extract_json(text))
+        if not isinstance(parsed, dict):
+            raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+        return parsed
+
+    @classmethod
+    def _parse_array(cls, text: str) -> List:
+        """Parse an LLM reply that must contain a JSON array"""
+        parsed = orjson.loads(cls._extract_json(text))
+        if not isinstance(parsed, list):
+            raise ValueError(f"expected a JSON array, got {type(parsed).__name__}")
+        return parsed
+
+    @staticmethod
+    def _attach_news_info(result: Dict, news: Dict) -> Dict:
+        """Copy title/source/published_utc from the original news onto a result"""
+        result["title"] = news.get("title", "")
+        result["source"] = news.get("source", "")
+        result["published_utc"] = news.get("published_utc", "")
+        return result
+
     def _default_result(self, news: Dict) -> Dict:
         """Return a default neutral result on failure"""
         return {
             "sentiment": "neutral",
             "score": 50,
             "confidence": 0,
-            "reason": "Analysis failed, using default",
+            "reason": FAILED_REASON,
             "title": news.get("title", ""),
             "source": news.get("source", ""),
             "published_utc": news.get("published_utc", "")
@@ -125,6 +315,10 @@ class SentimentAnalyzer:
         """
         Analyze sentiment for a batch of news articles using concurrent LLM calls.
 
+        Articles already in the cache are answered from it. The rest are grouped
+        into chunks of config.LLM_BATCH_SIZE and each chunk is scored with a
+        single LLM request.
+
         Args:
             news_list: List of news dicts
 
@@ -132,25 +326,49 @@ class SentimentAnalyzer:
             List of sentiment results (in original order)
         """
         total = len(news_list)
-        print(f"  Launching {total} analyses with {self.max_workers} concurrent workers...")
 
-        results = [None] * total
+        # Tiny batches: skip the thread pool entirely
+        if total <= 1:
+            return [self.analyze_single_news(news_list[0], 1, 1)] if total == 1 else []
+
+        results = [self._cached_result(news) for news in news_list]
+        pending = [i for i, result in enumerate(results) if result is None]
+
+        if len(pending) < total:
+            log(f"  [{news_list[0].get('ticker', '?')}] {total - len(pending)}/{total} articles served from cache")
+        if not pending:
+            return results
+
+        batch_size = max(1, config.LLM_BATCH_SIZE)
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_idx = {
+        if len(chunks) == 1:
+            for idx, result in zip(pending, self.analyze_news_minibatch([news_list[i] for i in pending], 0, len(pending))):
+                results[idx] = result
+            return results
+
+        workers = min(len(chunks), self.max_workers)
+        log(f"  [{news_list[0].get('ticker', '?')}] Launching {len(chunks)} analyses ({len(pending)} articles, "
+            f"up to {batch_size} per request) with {workers} concurrent workers...")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            future_to_chunk = {
                 executor.submit(
-                    self.analyze_single_news, news, i + 1, total
-                ): i
-                for i, news in enumerate(news_list)
+                    self.analyze_news_minibatch, [news_list[i] for i in chunk], n * batch_size, len(pending)
+                ): chunk
+                for n, chunk in enumerate(chunks)
             }
 
-            for future in as_completed(future_to_idx):
-                idx = future_to_idx[future]
+            for future in as_completed(future_to_chunk):
+                chunk = future_to_chunk[future]
                 try:
-                    results[idx] = future.result()
+                    chunk_results = future.result()
                 except Exception as e:
-                    print(f"  [{idx+1}/{total}] Worker error: {e}")
-                    results[idx] = self._default_result(news_list[idx])
+                    log(f"  [{news_list[chunk[0]].get('ticker', '?')} {chunk[0]+1}-{chunk[-1]+1}/{total}] Worker error: {e}")
+                    chunk_results = [self._default_result(news_list[i]) for i in chunk]
+
+                for idx, result in zip(chunk, chunk_results):
+                    results[idx] = result
 
         return results
 
@@ -177,27 +395,43 @@ class SentimentAnalyzer:
                 "neutral_count": 0
             }
 
-        # Count sentiment categories
-        bullish_count = sum(1 for r in results if r.get("sentiment") == "bullish")
-        bearish_count = sum(1 for r in results if r.get("sentiment") == "bearish")
-        neutral_count = sum(1 for r in results if r.get("sentiment") == "neutral")
+        n = len(results)
 
-        # Confidence-weighted average
-        total_weight = 0
-        weighted_score = 0
+        # Single pass: collect scores/confidences and count sentiment categories
+        scores = []
+        confidences = []
+        sentiment_counts = Counter()
+        failed_count = 0
 
         for r in results:
-            confidence = r.get("confidence", 50)
-            score = r.get("score", 50)
+            scores.append(r.get("score", 50))
+            confidences.append(r.get("confidence", 50))
+            sentiment_counts[r.get("sentiment", "neutral")] += 1
+            failed_count += r.get("reason") == FAILED_REASON
 
-            weight = confidence / 100.0 if confidence > 0 else 0.5
-            weighted_score += score * weight
-            total_weight += weight
+        bullish_count = sentiment_counts["bullish"]
+        bearish_count = sentiment_counts["bearish"]
+        neutral_count = sentiment_counts["neutral"]
 
-        if total_weight > 0:
-            final_score = weighted_score / total_weight
-        else:
-            final_score = 50
+        # Every article fell back to the default placeholder: nothing to weigh
+        if failed_count == n:
+            return {
+                "final_score": 50,
+                "sentiment": "neutral",
+                "news_count": n,
+                "avg_confidence": 0,
+                "bullish_count": bullish_count,
+                "bearish_count": bearish_count,
+                "neutral_count": neutral_count,
+                "details": results
+            }
+
+        scores = np.asarray(scores, dtype=np.float64)
+        confidences = np.asarray(confidences, dtype=np.float64)
+
+        # Confidence-weighted average
+        weights = np.where(confidences > 0, confidences / 100.0, 0.5)
+        final_score = float((scores * weights).sum() / weights.sum())
 
         # Determine overall sentiment
         if final_score >= 60:
@@ -207,12 +441,12 @@ class SentimentAnalyzer:
         else:
             overall_sentiment = "neutral"
 
-        avg_confidence = sum(r.get("confidence", 50) for r in results) / len(results)
+        avg_confidence = float(confidences.mean())
 
         return {
             "final_score": round(final_score, 2),
             "sentiment": overall_sentiment,
-            "news_count": len(results),
+            "news_count": n,
             "avg_confidence": round(avg_confidence, 2),
             "bullish_count": bullish_count,
             "bearish_count": bearish_count,
@@ -1,6 +1,9 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
+from numba import njit
 from massive import RESTClient
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 client = RESTClient("BjANqHq6MYW9FUD6r1IKsx81tHLY6m9l")
@@ -9,22 +12,68 @@ end = datetime.today()
 start = end - timedelta(days=120)
 ticker = 'AAPL'
 
-aggs = client.get_aggs(
-    ticker=ticker,
-    multiplier=1,
-    timespan="day",
-    from_=start.strftime("%Y-%m-%d"),
-    to=end.strftime("%Y-%m-%d"),
-)
-
-
-
-data = pd.DataFrame(aggs)
-
-data['timestamp'] = pd.to_datetime(data["timestamp"], unit="ms")
-data['volume'] = data['volume'].astype(int)
-data['open'] = data['open'].round(2)
-data.set_index("timestamp", inplace=True)
+# aggregates and both RSI windows are independent requests, so issue them concurrently
+with ThreadPoolExecutor(max_workers=3) as executor:
+    aggs_future = executor.submit(
+        client.get_aggs,
+        ticker=ticker,
+        multiplier=1,
+        timespan="day",
+        from_=start.strftime("%Y-%m-%d"),
+        to=end.strftime("%Y-%m-%d"),
+    )
+    rsi14_future = executor.submit(
+        client.get_rsi,
+        ticker=ticker,
+        timespan="day",
+        adjusted="true",
+        window="14",
+        series_type="close",
+        order="desc",
+        limit="10",
+    )
+    rsi50_future = executor.submit(
+        client.get_rsi,
+        ticker=ticker,
+        timespan="day",
+        adjusted="true",
+        window="50",
+        series_type="close",
+        order="desc",
+        limit="10",
+    )
+    aggs = aggs_future.result()
+    rsi14 = rsi14_future.result()
+    rsi50 = rsi50_future.result()
+
+
+# Polygon fields are Optional; map None to NaN like pd.DataFrame(aggs) did
+def _float(value):
+    return np.nan if value is None else value
+
+def _timestamp_index(timestamps):
+    return pd.DatetimeIndex(pd.to_datetime(timestamps, unit="ms"), name="timestamp")
+
+# build the columns straight from the Agg objects instead of going through pd.DataFrame(aggs)
+def aggs_to_frame(aggs):
+    n = len(aggs)
+    timestamps = np.fromiter((_float(a.timestamp) for a in aggs), dtype=np.float64, count=n)
+    volume = np.fromiter((_float(a.volume) for a in aggs), dtype=np.float64, count=n)
+    return pd.DataFrame(
+        {
+            'open': np.fromiter((_float(a.open) for a in aggs), dtype=np.float64, count=n),
+            'high': np.fromiter((_float(a.high) for a in aggs), dtype=np.float64, count=n),
+            'low': np.fromiter((_float(a.low) for a in aggs), dtype=np.float64, count=n),
+            'close': np.fromiter((_float(a.close) for a in aggs), dtype=np.float64, count=n),
+            # truncate like astype(int) (split-adjusted volumes can be fractional), then
+            # use a nullable integer so a missing volume stays <NA> instead of failing the cast
+            'volume': pd.array(np.trunc(volume), dtype="Int64"),
+        },
+        index=_timestamp_index(timestamps),
+    )
+
+
+data = aggs_to_frame(aggs)
 
 ##ticker = yf.Ticker("AAPL")
 ##data = ticker.history(period='6mo') #period must be longer than 3 months to properly calculate 100EMA
@@ -33,40 +82,63 @@ data.set_index("timestamp", inplace=True)
 # -----------------EMA-------------------------------------------------------------------------------
 
 
+# EMA smoothing factors, alpha = 2 / (span + 1)
+_A100 = 2 / (100 + 1)
+_A50 = 2 / (50 + 1)
+_A25 = 2 / (25 + 1)
+
+# explicit signature: compiled eagerly at import and cached to disk, so later runs skip the JIT warm-up
+@njit("f8[:,:](f8[:], f8, f8, f8)", cache=True, fastmath=True)
+def _ema3(close, a100, a50, a25):
+    # Fused EMA100/EMA50/EMA25 in a single pass over close
+    # (same recurrence as pandas ewm(span=..., adjust=False))
+    n = close.shape[0]
+    out = np.empty((n, 3))
+    if n == 0:
+        return out
+
+    ema100 = ema50 = ema25 = close[0]
+    out[0, 0] = ema100
+    out[0, 1] = ema50
+    out[0, 2] = ema25
+
+    for i in range(1, n):
+        ema100 = a100 * close[i] + (1.0 - a100) * ema100
+        ema50 = a50 * close[i] + (1.0 - a50) * ema50
+        ema25 = a25 * close[i] + (1.0 - a25) * ema25
+        out[i, 0] = ema100
+        out[i, 1] = ema50
+        out[i, 2] = ema25
+
+    return out
+
 def calculate_EMA(data):
-    data['EMA100'] = data['close'].ewm(span=100, adjust=False).mean().round(3)
-    data['EMA50'] = data['close'].ewm(span=50, adjust=False).mean().round(3)
-    data['EMA25'] = data['close'].ewm(span=25, adjust=False).mean().round(3)
+    # copy=True: under copy-on-write pandas returns a read-only view, which the
+    # eagerly compiled (writable) signature of _ema3 does not accept
+    close = data['close'].to_numpy(dtype=np.float64, copy=True)
+    ema = _ema3(close, _A100, _A50, _A25)
+    data[['EMA100', 'EMA50', 'EMA25']] = ema
 
 def is_ema100_uptrend(data, period):
-    ema100 = data['EMA100']
+    ema100 = data['EMA100'].to_numpy()
     # Check if the EMA100 has been on an uptrend for the past period=# days
-    if ema100.iloc[-1] > ema100.iloc[-period:].min():
-        return 1
-    else:
-        return 0
+    return int(ema100[-1] > ema100[-period:].min())
     
 # after testing, you can try adding points for "is_ema50_uptrend" and "is_ema25_uptrend"
 # BUT if ema25 and ema50 are already above ema100, adding points for being on an uptrend would
 # not add new value since those two emas being above 100 already means theyre on an uptrend
 
 def is_ema50_above_ema100(data, period):
-    ema50 = data['EMA50']
-    ema100 = data['EMA100']
+    ema50 = data['EMA50'].to_numpy()[-period:]
+    ema100 = data['EMA100'].to_numpy()[-period:]
     # Check if EMA50 has been above EMA100 the past period=# days
-    if all(ema50.iloc[-period:] > ema100.iloc[-period:]):
-        return 1
-    else:
-        return 0
+    return int((ema50 > ema100).all())
     
 def is_ema25_above_ema100(data, period):
-    ema25 = data['EMA25']
-    ema100 = data['EMA100']
+    ema25 = data['EMA25'].to_numpy()[-period:]
+    ema100 = data['EMA100'].to_numpy()[-period:]
     # Check if EMA25 has been above EMA100 the past period=# days
-    if all(ema25.iloc[-period:] > ema100.iloc[-period:]):
-        return 1
-    else:
-        return 0
+    return int((ema25 > ema100).all())
     
     
 # could add points for EMA range difference, IE, if ema25 is WAY above ema100, this is a bullish signal
@@ -79,20 +151,25 @@ def calculate_EMA_points(data, period):
     points = 0
     trend = 0
 
-    if (is_ema100_uptrend(data, period)):
+    # evaluate each EMA condition once and reuse for scoring and printing
+    ema100_uptrend = is_ema100_uptrend(data, period)
+    ema50_above = is_ema50_above_ema100(data, period)
+    ema25_above = is_ema25_above_ema100(data, period)
+
+    if (ema100_uptrend):
         points +=1
         trend = 1
     else: 
         points -=1
         trend = 0
         
-    if (is_ema50_above_ema100(data,period)):
+    if (ema50_above):
         points +=1
     else:
         if (trend == 0):
             points -=1
         
-    if (is_ema25_above_ema100(data,period)):
+    if (ema25_above):
         points +=2
     else:
         if (trend == 0):
@@ -100,13 +177,13 @@ def calculate_EMA_points(data, period):
 
     # print EMA conditions 
     print('EMA100 on an uptrend:')
-    print(is_ema100_uptrend(data,period))
+    print(ema100_uptrend)
     
     print('EMA50 above EMA100:')
-    print(is_ema50_above_ema100(data,period))
+    print(ema50_above)
 
     print('EMA25 above EMA100:')
-    print(is_ema25_above_ema100(data,period))
+    print(ema25_above)
     return points
 
 
@@ -114,43 +191,22 @@ def calculate_EMA_points(data, period):
 
 # -----RSI-------------------------------------------------------------------------------------------
 
-rsi14 = client.get_rsi(
-    ticker=ticker,
-	timespan="day",
-	adjusted="true",
-	window="14",
-	series_type="close",
-	order="desc",
-	limit="10",
-)
-
-rsi50 = client.get_rsi(
-    ticker=ticker,
-	timespan="day",
-	adjusted="true",
-	window="50",
-	series_type="close",
-	order="desc",
-	limit="10",
-)
+def rsi_to_frame(rsi, column):
+    values = rsi.values
+    n = len(values)
+    timestamps = np.fromiter((_float(v.timestamp) for v in values), dtype=np.float64, count=n)
+    return pd.DataFrame(
+        {column: np.fromiter((_float(v.value) for v in values), dtype=np.float64, count=n)},
+        index=_timestamp_index(timestamps),
+    )
 
-rsi14_data = pd.DataFrame([v.__dict__ for v in rsi14.values])
-rsi50_data = pd.DataFrame([v.__dict__ for v in rsi50.values])
 
-rsi14_data["timestamp"] = pd.to_datetime(rsi14_data["timestamp"], unit="ms")
-rsi14_data.set_index("timestamp", inplace=True)
-rsi50_data["timestamp"] = pd.to_datetime(rsi50_data["timestamp"], unit="ms")
-rsi50_data.set_index("timestamp", inplace=True)
+rsi14_data = rsi_to_frame(rsi14, "RSI14")
+rsi50_data = rsi_to_frame(rsi50, "RSI50")
 
-rsi14_data['value'] = rsi14_data['value'].round(2)
-rsi50_data['value'] = rsi50_data['value'].round(2)
+rsi_combined = pd.concat([rsi14_data, rsi50_data], axis=1, join="inner")
 
-rsi14_data = rsi14_data.rename(columns={"value": "RSI14"})
-rsi50_data = rsi50_data.rename(columns={"value": "RSI50"})
-
-rsi_combined = rsi14_data.join(rsi50_data, how="inner")  
-
-print(rsi_combined)
+print(rsi_combined.round(2))
 
 def rsi14_signal(rsi14_data):
     # Get the most recent RSI14 value
@@ -167,12 +223,16 @@ def rsi14_signal(rsi14_data):
 
 
 
+# rounding is display-only; analysis runs on full-precision values
+DISPLAY_DECIMALS = {'open': 2, 'EMA100': 3, 'EMA50': 3, 'EMA25': 3, 'RSI14': 2, 'RSI50': 2}
+
 def print_data(data):
-    print(data[['open', 'close', 'volume', 'EMA100', 'EMA50', 'EMA25', 'RSI14', 'RSI50']])
+    cols = ['open', 'close', 'volume', 'EMA100', 'EMA50', 'EMA25', 'RSI14', 'RSI50']
+    print(data[cols].round(DISPLAY_DECIMALS).to_string())
 
 
 calculate_EMA(data)
-full_data = data.join(rsi_combined, how="inner")  
+full_data = pd.concat([data, rsi_combined], axis=1, join="inner")
 points = calculate_EMA_points(full_data, 30)
 print('points:')
 print(points)